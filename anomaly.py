@@ -1,148 +1,254 @@
 # anomaly.py
 
-from typing import List, Dict, Any, Optional
-import statistics
+from collections import deque, namedtuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import math
 
 from models import Block
 
 
-class AnomalyDetector:
-    def __init__(self, baseline_size: int = 10, z_threshold: float = 3.0):
-        self.baseline_size = baseline_size
-        self.z_threshold = z_threshold
+# Fixed feature order shared by the running statistics and z-score vectors
+FEATURE_NAMES = ("num_txs", "total_amount", "max_amount", "time_delta")
 
-        # Store history of each feature separately
-        self.num_txs_history: List[float] = []
-        self.total_amount_history: List[float] = []
-        self.max_amount_history: List[float] = []
-        self.time_delta_history: List[float] = []
+# Block-level features as a typed record; being a tuple in FEATURE_NAMES
+# order, it doubles as the feature vector for the statistics
+Features = namedtuple("Features", FEATURE_NAMES)
+
+
+class Violation(namedtuple("Violation", "rule feature value op limit")):
+    """
+    A security rule violation. Kept as raw values and only formatted
+    to text when str() is taken, e.g. when the violation is reported.
+    """
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        digits = 3 if self.feature == "time_delta" else 2
+        return f"{self.rule}: {self.feature} {self.value:.{digits}f} {self.op} {self.limit:.{digits}f}"
 
-        # Baseline statistics (computed after enough blocks)
-        self.baseline_ready = False
-        self.stats = {
-            "num_txs": {"mean": None, "std": None},
-            "total_amount": {"mean": None, "std": None},
-            "max_amount": {"mean": None, "std": None},
-            "time_delta": {"mean": None, "std": None},
-        }
 
-    def _update_history(
+def _score(
+    values: Sequence[float],
+    means: List[float],
+    stds: List[float],
+    threshold: float
+) -> Tuple[List[float], int]:
+    """
+    Compute the z-score vector and the anomaly bitmask in one pass
+    (bit i set <=> |z| of FEATURE_NAMES[i] exceeds the threshold;
+    a feature with no variation yet never counts as anomalous).
+    """
+    z_scores = []
+    mask = 0
+    for i, (x, m, s) in enumerate(zip(values, means, stds)):
+        z = (x - m) / s if s != 0 else 0.0
+        z_scores.append(z)
+        mask |= (abs(z) > threshold) << i
+    return z_scores, mask
+
+
+class AnomalyDetector:
+    def __init__(
         self,
-        num_txs: float,
-        total_amount: float,
-        max_amount: float,
-        time_delta: float
+        baseline_size: int = 10,
+        z_threshold: float = 3.0,
+        window_size: Optional[int] = None
     ):
-        self.num_txs_history.append(num_txs)
-        self.total_amount_history.append(total_amount)
-        self.max_amount_history.append(max_amount)
-        self.time_delta_history.append(time_delta)
-
-    def _compute_baseline(self):
         """
-        Compute mean and std for each feature based on history.
-        Assumes history length >= baseline_size.
+        :param baseline_size: Number of blocks collected before detection starts.
+        :param z_threshold: A feature is anomalous if its |z-score| exceeds this.
+        :param window_size: If None, the baseline is frozen after baseline_size blocks.
+            Otherwise the baseline keeps adapting over the last window_size blocks
+            (must be at least 2 and at least baseline_size).
         """
-        def mean_std(lst):
-            m = statistics.mean(lst)
-            s = statistics.stdev(lst) if len(lst) > 1 else 0.0
-            return m, s
+        # A window needs at least 2 samples for a non-zero std, and must hold
+        # a full baseline for warmup to complete
+        if window_size is not None and window_size < max(2, baseline_size):
+            raise ValueError("window_size must be at least max(2, baseline_size)")
 
-        m, s = mean_std(self.num_txs_history)
-        self.stats["num_txs"]["mean"], self.stats["num_txs"]["std"] = m, s
+        self.baseline_size = baseline_size
+        self.z_threshold = z_threshold
+        self.window_size = window_size
 
-        m, s = mean_std(self.total_amount_history)
-        self.stats["total_amount"]["mean"], self.stats["total_amount"]["std"] = m, s
+        # Running statistics per feature (Welford's online algorithm):
+        # only n, mean and M2 (sum of squared deviations) are kept,
+        # so memory stays constant regardless of chain length.
+        # means[i] / m2s[i] refer to FEATURE_NAMES[i].
+        self.baseline_ready = False
+        self.count = 0
+        self.means: List[float] = [0.0] * len(FEATURE_NAMES)
+        self.m2s: List[float] = [0.0] * len(FEATURE_NAMES)
+        # Stds of the current baseline, recomputed only when the baseline moves
+        self._baseline_stds: List[float] = [0.0] * len(FEATURE_NAMES)
+        # Feature vectors inside the rolling window (only with window_size)
+        self._window: deque = deque()
 
-        m, s = mean_std(self.max_amount_history)
-        self.stats["max_amount"]["mean"], self.stats["max_amount"]["std"] = m, s
+    def _update_stats(self, values: Sequence[float]):
+        """
+        Fold one block's feature vector into the running mean/M2 of each feature.
+        """
+        self.count += 1
+        n = self.count
+        means = self.means
+        m2s = self.m2s
+        for i, x in enumerate(values):
+            delta = x - means[i]
+            means[i] += delta / n
+            m2s[i] += delta * (x - means[i])
 
-        m, s = mean_std(self.time_delta_history)
-        self.stats["time_delta"]["mean"], self.stats["time_delta"]["std"] = m, s
+        if self.window_size is not None:
+            self._window.append(values)
+            if len(self._window) > self.window_size:
+                self._window.popleft()
+                self._recompute_from_window()
 
-        self.baseline_ready = True
+    def _recompute_from_window(self):
+        """
+        Recompute mean/M2 of each feature exactly from the rolling window.
+        An inverse Welford update would leave rounding residue in M2, so a
+        window of identical values would get a tiny non-zero std and huge
+        z-scores. Deviations are taken from the window's first value, so
+        identical values give exactly mean = value and M2 = 0.
+        """
+        window = self._window
+        n = len(window)
+        self.count = n
+        for i, column in enumerate(zip(*window)):
+            shift = column[0]
+            mean = shift + math.fsum(x - shift for x in column) / n
+            self.means[i] = mean
+            self.m2s[i] = math.fsum((x - mean) * (x - mean) for x in column)
 
-    def _z_score(self, value: float, mean: float, std: float) -> float:
-        if std == 0:
-            return 0.0  # if no variation yet, no anomaly
-        return (value - mean) / std
+    def stds(self) -> List[float]:
+        """
+        Sample standard deviation of each feature (0.0 with fewer than 2 samples).
+        """
+        if self.count < 2:
+            return [0.0] * len(FEATURE_NAMES)
+        d = self.count - 1
+        return [math.sqrt(m2 / d) for m2 in self.m2s]
 
     def extract_features(
         self,
         current_block: Block,
         previous_block: Optional[Block]
-    ) -> Dict[str, float]:
-        num_txs = len(current_block.transactions)
-        total_amount = sum(t.amount for t in current_block.transactions) if current_block.transactions else 0.0
-        max_amount = max((t.amount for t in current_block.transactions), default=0.0)
+    ) -> Features:
+        amounts = current_block.amounts
+        num_txs = len(amounts)
+        total_amount = sum(amounts, 0.0)
+        max_amount = max(amounts) if num_txs else 0.0
         time_delta = (
             current_block.timestamp - previous_block.timestamp
             if previous_block is not None else 0.0
         )
 
-        return {
-            "num_txs": num_txs,
-            "total_amount": total_amount,
-            "max_amount": max_amount,
-            "time_delta": time_delta,
-        }
+        return Features(num_txs, total_amount, max_amount, time_delta)
 
-    def process_block(
+    def _decision(
         self,
         block_index: int,
-        features: Dict[str, float]
+        z_scores: List[float],
+        mask: int
     ) -> Dict[str, Any]:
         """
-        Update histories, possibly update baseline, and (if baseline ready)
-        compute z-scores and anomaly decision.
-        Returns a dict with decision info.
+        Build the decision dict for a block scored against a ready baseline.
         """
-        # Update histories
-        self._update_history(
-            features["num_txs"],
-            features["total_amount"],
-            features["max_amount"],
-            features["time_delta"]
-        )
-
         decision = {
             "block_index": block_index,
+            "baseline_ready": True,
             "is_anomaly": False,
-            "feature_z_scores": {},
+            "feature_z_scores": dict(zip(FEATURE_NAMES, z_scores)),
             "reason": ""
         }
 
-        # If not enough blocks for baseline, skip detection
-        if len(self.num_txs_history) < self.baseline_size:
-            decision["reason"] = "Not enough data for baseline"
-            return decision
+        # Decide anomaly if any |z| exceeds threshold; feature names are
+        # only collected when at least one bit is set
+        if mask:
+            anomalies = [
+                name for i, name in enumerate(FEATURE_NAMES) if mask >> i & 1
+            ]
+            decision["is_anomaly"] = True
+            decision["reason"] = f"Anomalous features: {', '.join(anomalies)} (z-score threshold = {self.z_threshold})"
+        else:
+            decision["reason"] = "Within normal range"
+
+        return decision
 
-        # If this is the first time we reach baseline_size, compute baseline
+    def process_block(
+        self,
+        block_index: int,
+        features: Features
+    ) -> Dict[str, Any]:
+        """
+        Update running statistics until the baseline is ready, then
+        compute z-scores and anomaly decision (and, with a rolling window,
+        keep updating the baseline).
+        Returns a dict with decision info.
+        """
+        # Accumulate statistics until the baseline is complete;
+        # afterwards the baseline stays frozen unless a rolling window is used
         if not self.baseline_ready:
-            self._compute_baseline()
+            self._update_stats(features)
+
+            decision = {
+                "block_index": block_index,
+                "baseline_ready": False,
+                "is_anomaly": False,
+                "feature_z_scores": {},
+                "reason": ""
+            }
+
+            # If not enough blocks for baseline, skip detection
+            if self.count < self.baseline_size:
+                decision["reason"] = "Not enough data for baseline"
+                return decision
+
+            self.baseline_ready = True
+            self._baseline_stds = self.stds()
+            decision["baseline_ready"] = True
             decision["reason"] = "Baseline just computed; no detection yet"
             return decision
 
-        # Compute z-scores for each feature
-        z_scores = {}
-        for feat_name in ["num_txs", "total_amount", "max_amount", "time_delta"]:
-            value = features[feat_name]
-            mean = self.stats[feat_name]["mean"]
-            std = self.stats[feat_name]["std"]
-            z = self._z_score(value, mean, std)
-            z_scores[feat_name] = z
+        z_scores, mask = _score(features, self.means, self._baseline_stds, self.z_threshold)
 
-        decision["feature_z_scores"] = z_scores
+        # Rolling window: slide the baseline after scoring the block against it
+        if self.window_size is not None:
+            self._update_stats(features)
+            self._baseline_stds = self.stds()
 
-        # Decide anomaly if any |z| exceeds threshold
-        anomalies = [f for f, z in z_scores.items() if abs(z) > self.z_threshold]
-        if anomalies:
-            decision["is_anomaly"] = True
-            decision["reason"] = f"Anomalous features: {', '.join(anomalies)} (z-score threshold = {self.z_threshold})"
-        else:
-            decision["reason"] = "Within normal range"
+        return self._decision(block_index, z_scores, mask)
 
-        return decision
+    def process_blocks(
+        self,
+        block_indices: Sequence[int],
+        features_list: Sequence[Features]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process a batch of blocks in order; same results as calling
+        process_block on each of them.
+        Once the baseline is ready and frozen, the remaining blocks are all
+        scored against the same means/stds in one tight loop.
+        """
+        if len(block_indices) != len(features_list):
+            raise ValueError("block_indices and features_list must have the same length")
+
+        decisions = []
+        num_blocks = len(features_list)
+        i = 0
+
+        # Baseline warmup (and rolling-window mode) needs per-block updates
+        while i < num_blocks and (not self.baseline_ready or self.window_size is not None):
+            decisions.append(self.process_block(block_indices[i], features_list[i]))
+            i += 1
+
+        means = self.means
+        stds = self._baseline_stds
+        threshold = self.z_threshold
+        for block_index, features in zip(block_indices[i:], features_list[i:]):
+            z_scores, mask = _score(features, means, stds, threshold)
+            decisions.append(self._decision(block_index, z_scores, mask))
+
+        return decisions
 
 class RuleBasedSecurityChecker:
         """
@@ -165,30 +271,31 @@ class RuleBasedSecurityChecker:
             self.max_block_total_amount = max_block_total_amount
             self.min_time_delta = min_time_delta
 
-        def check_rules(self, features: Dict[str, float]) -> Dict[str, any]:
+        def check_rules(self, features: Features) -> Dict[str, any]:
             """
             Evaluate the security rules on the given features.
-            Returns a dict with rule violations and overall decision.
+            Returns a dict with rule violations (Violation records) and overall decision.
             """
             violations = []
 
             # Rule 1: Single transaction amount too high
-            if features["max_amount"] > self.max_single_tx_amount:
+            if features.max_amount > self.max_single_tx_amount:
                 violations.append(
-                    f"Rule1: max_amount {features['max_amount']:.2f} > {self.max_single_tx_amount:.2f}"
+                    Violation("Rule1", "max_amount", features.max_amount, ">", self.max_single_tx_amount)
                 )
 
             # Rule 2: Block total amount too high
-            if features["total_amount"] > self.max_block_total_amount:
+            if features.total_amount > self.max_block_total_amount:
                 violations.append(
-                    f"Rule2: total_amount {features['total_amount']:.2f} > {self.max_block_total_amount:.2f}"
+                    Violation("Rule2", "total_amount", features.total_amount, ">", self.max_block_total_amount)
                 )
 
             # Rule 3: Blocks created too quickly
             # (ignore the very first block after genesis where time_delta may be 0)
-            if features["time_delta"] != 0.0 and features["time_delta"] < self.min_time_delta:
+            time_delta = features.time_delta
+            if time_delta != 0.0 and time_delta < self.min_time_delta:
                 violations.append(
-                    f"Rule3: time_delta {features['time_delta']:.3f} < {self.min_time_delta:.3f}"
+                    Violation("Rule3", "time_delta", time_delta, "<", self.min_time_delta)
                 )
 
             decision = {
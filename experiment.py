@@ -1,26 +1,60 @@
 # experiment.py
 
 import random
-import time
+import sys
+from typing import List, Tuple
 
 from models import Transaction
 from blockchain import Blockchain
 from anomaly import AnomalyDetector, RuleBasedSecurityChecker
 
 
-def generate_random_transaction(normal: bool = True) -> Transaction:
-    senders = ["Alice", "Bob", "Charlie", "Dave"]
-    receivers = ["Eve", "Frank", "Grace", "Heidi"]
+SENDERS = ("Alice", "Bob", "Charlie", "Dave")
+RECEIVERS = ("Eve", "Frank", "Grace", "Heidi")
 
-    sender = random.choice(senders)
-    receiver = random.choice(receivers)
 
-    if normal:
-        amount = random.uniform(1, 100)  # normal range
-    else:
-        amount = random.uniform(1000, 5000)  # anomalously high
-
-    return Transaction(sender=sender, receiver=receiver, amount=amount)
+def generate_blocks(
+    num_blocks: int,
+    anomaly_probability: float
+) -> List[Tuple[bool, List[Transaction]]]:
+    """
+    Pre-generate the synthetic label and transactions of every block.
+    Random values are drawn up front in a few batches
+    (one per quantity, for all blocks/transactions at once)
+    instead of several random.* calls per transaction inside the loop.
+    """
+    rand = random.random
+
+    # Decide whether each block is "normal" or "anomalous" (synthetic label)
+    labels = [rand() < anomaly_probability for _ in range(num_blocks)]
+
+    # More transactions in anomalous blocks (just as one possible signal)
+    anomalous_counts = random.choices(range(6, 11), k=num_blocks)
+    normal_counts = random.choices(range(1, 6), k=num_blocks)
+    tx_counts = [
+        a if is_anomalous else n
+        for is_anomalous, a, n in zip(labels, anomalous_counts, normal_counts)
+    ]
+
+    total_txs = sum(tx_counts)
+    senders = random.choices(SENDERS, k=total_txs)
+    receivers = random.choices(RECEIVERS, k=total_txs)
+    draws = [rand() for _ in range(total_txs)]
+
+    blocks = []
+    start = 0
+    for is_anomalous, count in zip(labels, tx_counts):
+        # Amounts: normal range vs anomalously high
+        low, high = (1000.0, 5000.0) if is_anomalous else (1.0, 100.0)
+        span = high - low
+        txs = [
+            Transaction(sender=senders[j], receiver=receivers[j], amount=low + span * draws[j])
+            for j in range(start, start + count)
+        ]
+        blocks.append((is_anomalous, txs))
+        start += count
+
+    return blocks
 
 
 def run_experiment(
@@ -45,71 +79,76 @@ def run_experiment(
         min_time_delta=0.02
     )
 
-    previous_block = bc.last_block
+    # Log lines are buffered and written to stdout in one go at the end,
+    # instead of one print() per line
+    log_lines = []
+    log = log_lines.append
 
-    for i in range(1, num_blocks + 1):
-        # Decide whether this block is "normal" or "anomalous" (synthetic label)
-        is_anomalous_block = random.random() < anomaly_probability
-
-        # More transactions in anomalous block (just as one possible signal)
-        if is_anomalous_block:
-            num_txs = random.randint(6, 10)
-        else:
-            num_txs = random.randint(1, 5)
-
-        txs = []
-        for _ in range(num_txs):
-            tx = generate_random_transaction(normal=not is_anomalous_block)
-            txs.append(tx)
+    # Simulated clock: block timestamps are advanced explicitly
+    # instead of sleeping between blocks
+    sim_time = bc.last_block.timestamp
 
+    # Build the whole chain first; the analysis below then runs as batches
+    labels = []
+    for is_anomalous_block, txs in generate_blocks(num_blocks, anomaly_probability):
         # Manipulate time interval between blocks:
         # - anomalous blocks: very short interval
         # - normal blocks: slightly longer interval
         if is_anomalous_block:
-            time.sleep(0.01)
+            sim_time += 0.01
         else:
-            time.sleep(0.1)
+            sim_time += 0.1
 
         # Add block to chain
-        new_block = bc.add_block(txs)
-
-        # Extract features for anomaly detection and rule-based checks
-        features = detector.extract_features(new_block, previous_block)
-
-        # Statistical anomaly detection (z-score)
-        decision = detector.process_block(new_block.index, features)
+        bc.add_block(txs, timestamp=sim_time)
+        labels.append(is_anomalous_block)
+
+    # Extract features for anomaly detection and rule-based checks
+    # (each new block paired with its predecessor)
+    new_blocks = bc.chain[1:]
+    features_list = [
+        detector.extract_features(block, previous)
+        for block, previous in zip(new_blocks, bc.chain)
+    ]
+
+    # Statistical anomaly detection (z-score) over all blocks at once
+    decisions = detector.process_blocks(
+        [block.index for block in new_blocks], features_list
+    )
 
+    for new_block, is_anomalous_block, features, decision in zip(
+        new_blocks, labels, features_list, decisions
+    ):
         # Rule-based security checks
         rule_decision = rule_checker.check_rules(features)
 
         # Log output for later analysis in the report
-        print("=" * 60)
-        print(f"Block {new_block.index}")
-        print(f"  Synthetic label (is_anomalous_block)? {is_anomalous_block}")
-        print(f"  num_txs={features['num_txs']}, "
-              f"total_amount={features['total_amount']:.2f}, "
-              f"max_amount={features['max_amount']:.2f}, "
-              f"time_delta={features['time_delta']:.3f}")
+        log("=" * 60)
+        log(f"Block {new_block.index}")
+        log(f"  Synthetic label (is_anomalous_block)? {is_anomalous_block}")
+        log(f"  num_txs={features.num_txs}, "
+            f"total_amount={features.total_amount:.2f}, "
+            f"max_amount={features.max_amount:.2f}, "
+            f"time_delta={features.time_delta:.3f}")
 
         # Output anomaly detector (statistical)
-        print(f"  [Statistical] baseline_ready={detector.baseline_ready}")
-        print(f"  [Statistical] is_anomaly={decision['is_anomaly']}")
-        print(f"  [Statistical] Reason: {decision['reason']}")
+        log(f"  [Statistical] baseline_ready={decision['baseline_ready']}")
+        log(f"  [Statistical] is_anomaly={decision['is_anomaly']}")
+        log(f"  [Statistical] Reason: {decision['reason']}")
         if decision["feature_z_scores"]:
-            print(
+            log(
                 "  [Statistical] z-scores: "
                 + ", ".join(f"{k}={v:.2f}" for k, v in decision["feature_z_scores"].items())
             )
 
         # Output rule-based checker
-        print(f"  [Rules] rule_alert={rule_decision['rule_alert']}")
+        log(f"  [Rules] rule_alert={rule_decision['rule_alert']}")
         if rule_decision["rule_alert"]:
-            print("  [Rules] Violations:")
+            log("  [Rules] Violations:")
             for v in rule_decision["violations"]:
-                print(f"    - {v}")
-
-        previous_block = new_block
+                log(f"    - {v}")
 
     # Final integrity check
-    print("=" * 60)
-    print("Final chain validity:", bc.is_chain_valid())
\ No newline at end of file
+    log("=" * 60)
+    log(f"Final chain validity: {bc.is_chain_valid()}")
+    sys.stdout.write("\n".join(log_lines) + "\n")
\ No newline at end of file
@@ -1,10 +1,30 @@
 # models.py
 
 import hashlib
-import json
+import struct
+from array import array
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List
 
+# Binary layout used as SHA-256 input (little-endian, fixed width):
+#   header: index (int64), timestamp (float64), nonce (int64),
+#           number of transactions (uint32), previous_hash length (uint32)
+#   previous_hash as raw digest bytes
+#   per transaction: amount (float64), sender length, receiver length (uint32)
+# Sender/receiver names follow their fixed-width record as UTF-8.
+_HEADER = struct.Struct("<qdqII")
+_TX = struct.Struct("<dII")
+
+
+@lru_cache(maxsize=1024)
+def _utf8(s: str) -> bytes:
+    """
+    UTF-8 encoding of a sender/receiver name, memoized because
+    the same few names recur across many transactions.
+    """
+    return s.encode()
+
 
 @dataclass
 class Transaction:
@@ -18,24 +38,53 @@ class Block:
     index: int
     timestamp: float
     transactions: List[Transaction]
-    previous_hash: str
+    previous_hash: bytes
     nonce: int = 0
-    hash: str = field(init=False)
+    # Raw 32-byte SHA-256 digest; use hash_hex for display
+    hash: bytes = field(init=False)
+    # Transaction amounts as a contiguous float64 column (structure of arrays),
+    # so block-level aggregates avoid per-transaction attribute lookups.
+    # Built once at construction: transactions are immutable afterwards.
+    amounts: array = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
+        self.amounts = array("d", [t.amount for t in self.transactions])
         self.hash = self.compute_hash()
 
-    def compute_hash(self) -> str:
+    @property
+    def hash_hex(self) -> str:
+        return self.hash.hex()
+
+    def serialize(self) -> bytes:
+        """
+        Pack the block contents (excluding the hash field itself)
+        into the binary layout used as SHA-256 input.
+        """
+        parts = [
+            _HEADER.pack(self.index, self.timestamp, self.nonce,
+                         len(self.transactions), len(self.previous_hash)),
+            self.previous_hash,
+        ]
+        for t in self.transactions:
+            sender = _utf8(t.sender)
+            receiver = _utf8(t.receiver)
+            parts.append(_TX.pack(t.amount, len(sender), len(receiver)))
+            parts.append(sender)
+            parts.append(receiver)
+        return b"".join(parts)
+
+    def compute_hash(self) -> bytes:
         """
         Compute SHA-256 hash of the block contents
         (excluding the current hash field itself).
         """
-        block_dict = {
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "transactions": [t.__dict__ for t in self.transactions],
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce,
-        }
-        block_string = json.dumps(block_dict, sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(self.serialize()).digest()
+
+    def verify(self) -> bool:
+        """
+        Check that the stored hash still matches the live block contents.
+        Transactions are immutable after construction (amounts is derived
+        from them once); only header fields such as nonce may change,
+        followed by block.hash = block.compute_hash().
+        """
+        return self.compute_hash() == self.hash